@@ -1,11 +1,15 @@
-from collections import Counter
-from functools import partial
+from functools import lru_cache, partial
+from operator import attrgetter
 from pathlib import Path
-from typing import Callable, List, Generator, Iterable, Tuple
+from queue import SimpleQueue
+from typing import Callable, List, Generator, Iterable, Iterator, Tuple
 import click
+import concurrent.futures
 import logging
 import mimetypes
 import os
+import threading
+import time
 
 from rich.live import Live
 from rich.console import Group
@@ -14,7 +18,7 @@ from rich.progress import Progress
 from . import utils
 from .fio import fio_client, stream_endpoint
 from .config import column_default
-from .uploader import FrameioUploader
+from .uploader import CHUNK_CONCURRENCY, UPLOAD_CONCURRENCY, FrameioUploader
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +35,34 @@ PROXY_TABLE = {
 
 PROXY_CASCADE = ["high", "medium", "low"]
 
+# Files uploaded at the same time
+UPLOAD_CAPACITY = 5
+# Remote folders listed at once when walking a folder tree
+LIST_CAPACITY = 16
+# Minimum time between redraws of a progress bar while it's advancing
+PROGRESS_INTERVAL_SEC = 0.1
+
+# Files smaller than this only count towards the total progress, without a row of their own
+PROGRESS_ROW_MIN_FILESIZE = 16 * 1024 * 1024
+
+# File extension of each proxy that isn't an mp4
+PROXY_EXT = {
+    proxy: "jpeg"
+    for (_, asset_type), proxies in PROXY_TABLE.items() if asset_type == "image"
+    for proxy in proxies
+}
+
+# (asset type, requested level) -> every proxy to try, in cascade order, ending with the original
+PROXY_BY_TYPE_LEVEL = {
+    (asset_type, level): tuple(
+        proxy
+        for fallback in PROXY_CASCADE[idx:]
+        for proxy in PROXY_TABLE.get((fallback, asset_type), [])
+    ) + ("original",)
+    for asset_type in {asset_type for _, asset_type in PROXY_TABLE}
+    for idx, level in enumerate(PROXY_CASCADE)
+}
+
 class QueuedAsset(object):
     pass
 
@@ -42,32 +74,53 @@ class QueuedAssetUpload(QueuedAsset):
         origin_path: str | Path,
         type: str,
         asset: dict = None,
+        filesize: int = None,
     ):
         self.asset = asset
         self.destination_id = destination_id
         self.filepath = filepath
         self.origin_path = origin_path
         self.type = type
-        if self.type == 'f':
+        self.filesize = filesize
+        self.display_path = self._relative_path(filepath, origin_path)
+        if self.type == 'f' and self.filesize is None:
+            # Stat once here, the size is carried through to the upload itself
             self.filesize = filepath.stat().st_size
 
     def __str__(self):
         return self.filepath
 
+    @staticmethod
+    def _relative_path(filepath: str | Path, origin_path: str | Path) -> str:
+        # Plain string slicing when the path sits under its origin, which is the usual case
+        path, prefix = str(filepath), os.path.join(str(origin_path), '')
+        if path.startswith(prefix):
+            return path[len(prefix):]
+        return str(Path(filepath).relative_to(origin_path))
+
 class UploadQueue(object):
     def __init__(self):
-        self.queue = []
+        # Keyed by the item itself, so removing a finished one doesn't scan the whole queue.
+        # Items with the same filepath are kept apart, each is uploaded as it was given
+        self.queue = {}
+        self._sorted = None
     
     def add(self, item: QueuedAsset):
-        self.queue.append(item)
-        logger.debug(f'Added item to queue: {item.filepath}')
+        self.queue[id(item)] = item
+        self._sorted = None
+        logger.debug('Added item to queue: %s', item.filepath)
 
     def remove(self, item: QueuedAsset):
-        self.queue.remove(item)
+        del self.queue[id(item)]
+        self._sorted = None
 
     @property
-    def all(self) -> Generator:
-        return ( i for i in sorted(self.queue, key=lambda item: item.filepath) )
+    def all(self) -> Iterator:
+        # Sorted once up front, parent folders come before their contents.
+        # The sorted view is kept until the queue changes
+        if self._sorted is None:
+            self._sorted = sorted(self.queue.values(), key=attrgetter('filepath'))
+        return iter(self._sorted)
 
 
 @click.group()
@@ -104,10 +157,12 @@ def traverse(asset_id, format, columns):
         attrs = ", ".join(f"{col}: {val}" for col, val in col_vals)
         return f"Asset[{attrs}]"
 
+    # Folders are listed on LIST_CAPACITY threads sharing this client
+    client = fio_client(pool_size=LIST_CAPACITY)
     format(
         (
             asset
-            for _, asset in remote_folder_stream(fio_client(), asset_id, "/", recurse_vs=True)
+            for _, asset in remote_folder_stream(client, asset_id, "/", recurse_vs=True)
         ),
         cols=columns,
         root=(f"Asset[id: {asset_id}]", asset_id),
@@ -215,22 +270,26 @@ def unversion(asset_id, format, columns):
 @click.option(
     "--include-files",
     type=utils.RegexType(),
-    help="Regex pattern to include disk files from being uploaded. Applies only to files found beneath the disk items.)",
+    multiple=True,
+    help="Regex pattern to include disk files from being uploaded. Applies only to files found beneath the disk items. Can be given more than once.",
 )
 @click.option(
     "--include-folders",
     type=utils.RegexType(),
-    help="Regex pattern to include disk folders from being uploaded. Applies only to folders found beneath the disk items.)",
+    multiple=True,
+    help="Regex pattern to include disk folders from being uploaded. Applies only to folders found beneath the disk items. Can be given more than once.",
 )
 @click.option(
     "--exclude-files",
     type=utils.RegexType(),
-    help="Regex pattern to exclude disk files from being uploaded. Applies only to files found beneath the disk items.)",
+    multiple=True,
+    help="Regex pattern to exclude disk files from being uploaded. Applies only to files found beneath the disk items. Can be given more than once.",
 )
 @click.option(
     "--exclude-folders",
     type=utils.RegexType(),
-    help="Regex pattern to exclude disk folders from being uploaded. Applies only to folders found beneath the disk items.)",
+    multiple=True,
+    help="Regex pattern to exclude disk folders from being uploaded. Applies only to folders found beneath the disk items. Can be given more than once.",
 )
 def upload(
     ctx,
@@ -253,18 +312,65 @@ def upload(
         return remote_asset
     
     def on_filesize_uploaded(task, advance: int = 0):
-        progress_per_file.update(task, advance=advance)
+        if task is not None:
+            progress_per_file.update(task, advance=advance)
         progress_total.filesize_update(advance=advance)
 
+    def create_parent_folder(name: str) -> str:
+        asset = create_asset(client, parent_id, {"type": "folder", "name": name})
+        return asset['id']
+
+    def scan_disk_item(disk_item: Path) -> List[QueuedAssetUpload]:
+        queued_items = []
+        if disk_item.is_dir():
+            if contents_only:
+                # Disk contents will go directly into the remote parent folder without any subfolder
+                destination_parent_id = parent_id
+            elif filtering:
+                # Create a parent folder on the remote side, that takes the name of the input disk folder.
+                # Deferred until the first file needs to go inside it, the filters may leave it empty
+                destination_parent_id = utils.Lazy(create_parent_folder, disk_item.name)
+            else:
+                # Create a parent folder on the remote side, that takes the name of the input disk folder
+                destination_parent_id = create_parent_folder(disk_item.name)
+            # Look at the disk tree and queue items
+            stream = utils.stream_fs_pathlib(
+                disk_item,
+                filter_d = filter_d,
+                filter_f = filter_f,
+            )
+            for type, filepath, stat in stream:
+                # Add files and folders to the queue.
+                # Folders: just the path is stored, creation of remote assets does not take place until
+                # the queue is actually processed. 
+                queued_items.append(QueuedAssetUpload(
+                    destination_id = destination_parent_id,
+                    filepath = filepath,
+                    origin_path = disk_item,
+                    type = type,
+                    filesize = stat.st_size if stat else None,
+                ))
+
+        elif disk_item.is_file():
+            queued_items.append(QueuedAssetUpload(
+                destination_id = parent_id, # This file will go directly into the specified remote folder 
+                filepath = disk_item,
+                origin_path = disk_item.parent, # Its origin path is the parent folder
+                type = 'f',
+            ))
+        return queued_items
+
     if values:
         click.ParamType.fail('Specifying `values` is not yet implemented for `fioctl assets upload`')
 
-    # FIO api client
-    client = fio_client()
+    # FIO api client, with a connection for every upload worker and the folders they create
+    client = fio_client(pool_size=UPLOAD_CAPACITY * 2)
 
-    # Blank filters - to be overridden by user filters
-    filter_d = lambda pass_all: True
-    filter_f = lambda pass_all: True
+    # Patterns are the same for every disk item, so only build the filters once
+    filter_d = utils.create_include_exclude_filter(include_folders, exclude_folders)
+    filter_f = utils.create_include_exclude_filter(include_files, exclude_files)
+    # Without filters every folder on disk is recreated remotely, empty or not
+    filtering = any((include_files, include_folders, exclude_files, exclude_folders))
 
     # Store files/folders to upload
     queue = UploadQueue()
@@ -279,56 +385,17 @@ def upload(
         progress_total,
     )
 
-    with Live(live_group):
+    with Live(live_group, refresh_per_second=utils.PROGRESS_REFRESH_PER_SECOND):
         logger.debug(f"Disk items: {disk_items}")
 
-        for disk_item in disk_items:
-            if disk_item.is_dir():
-                if include_folders or exclude_folders:
-                    filter_d = utils.create_include_exclude_filter(include_folders, exclude_folders)
-                if include_files or exclude_files:
-                    filter_f = utils.create_include_exclude_filter(include_files, exclude_files)
-                if contents_only:
-                    # Disk contents will go directly into the remote parent folder without any subfolder
-                    destination_parent_id = parent_id
-                else:
-                    # Create a parent folder on the remote side, that takes the name of the input disk folder
-                    folder_asset = create_asset(
-                        client, parent_id, {"type": "folder", "name": disk_item.name}
-                    )
-                    destination_parent_id = folder_asset['id']
-                # Look at the disk tree and queue items
-                stream = utils.stream_fs_pathlib(
-                    disk_item,
-                    filter_d = filter_d,
-                    filter_f = filter_f,
-                )
-                for type, filepath in stream:
-                    # Add files and folders to the queue.
-                    # Folders: just the path is stored, creation of remote assets does not take place until
-                    # the queue is actually processed. 
-                    queued_item = QueuedAssetUpload(
-                        destination_id = destination_parent_id,
-                        filepath = filepath,
-                        origin_path = disk_item,
-                        type = type,
-                    )
-                    queue.add(queued_item)
-                    if type == 'f':
-                        # Don't increment folders
-                        progress_total.files_update(increment_total=1)
-                        progress_total.filesize_update(increment_total=queued_item.filesize)
-
-            elif disk_item.is_file():
-                queued_item = QueuedAssetUpload(
-                    destination_id = parent_id, # This file will go directly into the specified remote folder 
-                    filepath = disk_item,
-                    origin_path = disk_item.parent, # Its origin path is the parent folder
-                    type = 'f',
-                )
+        # Independent trees are walked in parallel, their items are added to the queue here
+        for queued_items in utils.parallelize(scan_disk_item, disk_items, capacity=4):
+            for queued_item in queued_items:
                 queue.add(queued_item)
-                progress_total.files_update(increment_total=1)
-                progress_total.filesize_update(increment_total=queued_item.filesize)
+                if queued_item.type == 'f':
+                    # Don't increment folders
+                    progress_total.files_update(increment_total=1)
+                    progress_total.filesize_update(increment_total=queued_item.filesize)
         
         if len(queue.queue) == 0:
             ctx.exit()
@@ -340,6 +407,8 @@ def upload(
             queued_items = queue.all,
             progress = progress_per_file,
             progress_callback = on_filesize_uploaded,
+            capacity = UPLOAD_CAPACITY,
+            create_empty_folders = not filtering,
         )
         results = [ handle_result(*u) for u in upload ]
         format(
@@ -375,7 +444,7 @@ def upload(
 )
 @click.option("--format", type=utils.FormatType(), default="table")
 def download(asset_id, destination, proxy, recursive, format):
-    client = fio_client()
+    client = fio_client(pool_size=LIST_CAPACITY)
     if recursive:
         format(
             download_stream(client, asset_id, destination, proxy),
@@ -415,16 +484,11 @@ def create(parent_id, values, format, columns):
 
 
 def filename(name, proxy, path=None):
-    def proxy_ext(proxy):
-        if "image" in proxy:
-            return "jpeg"
-        return "mp4"
-
-    name, ext = os.path.splitext(name)
-
-    default_name = (
-        f"{name}{ext}" if proxy == "original" else f"{name}.{proxy}.{proxy_ext(proxy)}"
-    )
+    if proxy == "original":
+        default_name = name
+    else:
+        base, _ = os.path.splitext(name)
+        default_name = f"{base}.{proxy}.{PROXY_EXT.get(proxy, 'mp4')}"
     return os.path.join(path, default_name) if path else os.path.abspath(default_name)
 
 
@@ -438,13 +502,12 @@ def get_proxy(asset, proxy):
         return ("original", asset["original"])
 
     if proxy not in PROXY_CASCADE:
-        return asset.get(proxy)
+        return (proxy, asset.get(proxy))
 
-    idx = PROXY_CASCADE.index(proxy)
-    for level in PROXY_CASCADE[idx:]:
-        for proxy in PROXY_TABLE.get((level, asset_type), []):
-            if asset.get(proxy):
-                return (proxy, asset[proxy])
+    for candidate in PROXY_BY_TYPE_LEVEL.get((asset_type, proxy), ("original",)):
+        url = asset.get(candidate)
+        if url:
+            return (candidate, url)
 
     return ("original", asset["original"])
 
@@ -457,6 +520,8 @@ def download_stream(client, parent_id, root, proxy=None, capacity=10):
         proxy_name, url = get_proxy(file, proxy)
         asset_id = file["id"]
         name = filename(name, proxy_name)
+        # Folders are made on other workers, a file can get here before its folder does
+        os.makedirs(os.path.dirname(name), exist_ok=True)
         position = tracker.acquire()
         utils.download(url, name, position=position, desc=os.path.relpath(name, root))
         tracker.release(position)
@@ -476,33 +541,65 @@ def download_stream(client, parent_id, root, proxy=None, capacity=10):
         yield result
 
 
-def remote_folder_stream(client, parent_id, root, recurse_vs=False):
-    sibling_counter = Counter()
-    for asset in stream_endpoint(f"/assets/{parent_id}/children"):
-        name = os.path.join(root, asset["name"])
-        sibling_counter[name] += 1
-        if sibling_counter[name] > 1:
-            base, ext = os.path.splitext(name)
-            name = f"{base}_{sibling_counter[name]}{ext}"
-
-        if asset["_type"] == "folder":
-            yield (name, asset)
-
-            for result in remote_folder_stream(client, asset["id"], name):
-                yield result
-
-        if recurse_vs and asset["_type"] == "version_stack":
-            yield (name, asset)
-            for result in remote_folder_stream(
-                client, asset["id"], os.path.join(name, "versions")
-            ):
-                yield result
-
-        elif asset["_type"] == "version_stack":
-            yield (name, asset["cover_asset"])
-
-        if asset["_type"] == "file":
-            yield (name, asset)
+def remote_folder_stream(client, parent_id, root, recurse_vs=False, capacity=LIST_CAPACITY):
+    def children(parent_id, root):
+        return root, tuple(stream_endpoint(f"/assets/{parent_id}/children", client=client))
+
+    # Folders are listed breadth first, several at once. A folder is always yielded
+    # before anything inside it, but the contents of different folders may interleave
+    completed = SimpleQueue()
+    executor = concurrent.futures.ThreadPoolExecutor(capacity)
+
+    def list_folder(parent_id, root):
+        executor.submit(children, parent_id, root).add_done_callback(completed.put)
+
+    try:
+        list_folder(parent_id, root)
+        in_flight = 1
+        while in_flight:
+            in_flight -= 1
+            root, assets = completed.get().result()
+            sibling_counter = {}
+            for asset in assets:
+                # Siblings share a single root, so counting bare names is enough
+                name = asset["name"]
+                count = sibling_counter.get(name, 0) + 1
+                sibling_counter[name] = count
+                if count > 1:
+                    base, ext = os.path.splitext(name)
+                    name = f"{base}_{count}{ext}"
+                name = os.path.join(root, name)
+
+                if asset["_type"] == "folder":
+                    yield (name, asset)
+                    list_folder(asset["id"], name)
+                    in_flight += 1
+
+                elif recurse_vs and asset["_type"] == "version_stack":
+                    yield (name, asset)
+                    list_folder(asset["id"], os.path.join(name, "versions"))
+                    in_flight += 1
+
+                elif asset["_type"] == "version_stack":
+                    yield (name, asset["cover_asset"])
+
+                elif asset["_type"] == "file":
+                    yield (name, asset)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+@lru_cache(maxsize=256)
+def guess_filetype(suffix: str) -> str | None:
+    """
+    Mimetypes only depend on the extension, so look each one up once.
+    The encoding half of `guess_type` is dropped, only the type is sent to the API
+    """
+    # The system tables are only read on first use, so other commands skip loading them
+    if not mimetypes.inited:
+        mimetypes.init()
+    # Most extensions are a plain entry in the table, the full guess handles the rest
+    return mimetypes.types_map.get(suffix) or mimetypes.guess_type(f"file{suffix}")[0]
 
 
 def create_asset(client, parent_id, asset):
@@ -518,37 +615,90 @@ def upload_handler(
     progress: Progress,
     progress_callback: Callable,
     capacity: int = 5,
+    create_empty_folders: bool = False,
 ):
     directories = {}
     tracker = utils.PositionTracker(capacity)
+    # Folders that actually got created on the remote side
+    folders = []
+    # Caps chunk PUTs in flight across every file, so one large file can't take
+    # all the bandwidth from the small ones uploading alongside it
+    chunk_slots = threading.BoundedSemaphore(UPLOAD_CONCURRENCY)
+    # Per task: bytes uploaded but not shown yet, and when it was last redrawn
+    pending_progress = {}
+    progress_lock = threading.Lock()
 
     def update_progress(task = None, value = None, start: bool = False):
         if start is True:
-            return progress.start_task(task)
-        else:
-            return progress_callback(task, advance=value)
-
-    def create_folder(parent_id, folder: Path, name: str):
-        parent_id = directories.get(folder.parent)
+            if task is not None:
+                progress.start_task(task)
+            return
+        now = time.monotonic()
+        with progress_lock:
+            pending, last_flush = pending_progress.get(task, (0, 0.0))
+            pending += value
+            if now - last_flush < PROGRESS_INTERVAL_SEC:
+                # Coalesce, the next update after the interval shows it
+                pending_progress[task] = (pending, last_flush)
+                return
+            pending_progress[task] = (0, now)
+        return progress_callback(task, advance=pending)
+
+    def flush_progress(task = None):
+        with progress_lock:
+            pending, _ = pending_progress.pop(task, (0, 0.0))
+        if pending:
+            progress_callback(task, advance=pending)
+
+    def resolve(remote_id) -> str:
+        # Remote folders are only created once something needs to go inside them
+        if isinstance(remote_id, utils.Lazy):
+            return remote_id.result()
+        return remote_id
+
+    def destination_of(item: QueuedAsset):
+        # Check to see if this item now has a remote side parent folder that we can place it in
+        parent = directories.get(item.filepath.parent)
+        if parent is not None:
+            return parent
+        # Initially set the origin path -> ID
+        return directories.setdefault(item.origin_path, item.destination_id)
+
+    def schedule_folders(items: Iterator, folder_executor, created: List) -> Generator:
+        # Register each folder before any of its contents are submitted. Unless `create_empty_folders`
+        # is set, nothing is created yet: the first file that needs a folder creates it (and any
+        # parents still missing), so folders that end up empty after filtering never cost a request.
+        # Only files continue on to the upload workers
+        for item in items:
+            if item.type == 'd':
+                folder = utils.Lazy(create_folder, destination_of(item), item)
+                directories[item.filepath] = folder
+                if create_empty_folders:
+                    created.append(folder_executor.submit(folder.result))
+            else:
+                destination = destination_of(item)
+                if isinstance(destination, utils.Lazy) and destination.future is None:
+                    # Start creating the folder now, alongside its siblings, rather than when an
+                    # upload worker gets to the file. Any error is raised again by that worker
+                    folder_executor.submit(destination.result)
+                yield item
+
+    def create_folder(parent_id, item: QueuedAsset) -> str:
         asset = create_asset(
             client,
-            parent_id,
-            { "type": "folder", "name": name },
+            resolve(parent_id),
+            { "type": "folder", "name": item.filepath.name },
         )
-        directories[folder] = asset["id"]
-        asset["source"] = folder
-        return asset
+        asset["source"] = item.display_path
+        folders.append((item, asset))
+        return asset["id"]
 
-    def upload_file(parent_id, filepath: Path, origin_path: Path):
-        # Look up the destination remote ID based on a flat map of the dir paths we are keeping
-        parent_id = directories.get(filepath.parent)
+    def upload_file(parent_id, filepath: Path, filepath_display: str, filesize: int):
         name = filepath.name
-        filepath_display = filepath.relative_to(origin_path)
-        if filepath_display == '.':
-            filepath_display = name
-        filesize = filepath.stat().st_size
-        filetype = mimetypes.guess_type(filepath)[0]
-        this_task = progress.add_task(description=filepath_display, total=filesize, start=False)
+        filetype = guess_filetype(filepath.suffix.lower())
+        this_task = None
+        if filesize >= PROGRESS_ROW_MIN_FILESIZE:
+            this_task = progress.add_task(description=filepath_display, total=filesize, start=False)
         position = tracker.acquire()
         asset = create_asset(
             client,
@@ -560,19 +710,32 @@ def upload_handler(
                 "type": "file",
             },
         )
-        uploader = FrameioUploader(
-            asset,
-            filepath,
-            position,
-            progress_callback = partial(
-                update_progress,
-                this_task,
-            ),
-        )
-        result = uploader.upload()
+        # Opened here rather than by the uploader, the size is already known from the scan
+        try:
+            file = open(filepath, 'rb', buffering = 0)
+        except OSError as e:
+            # Gone or unreadable since the scan, only this file fails
+            logger.error(f'{name}: {e}')
+            result = False
+        else:
+            with file:
+                uploader = FrameioUploader(
+                    asset,
+                    filepath,
+                    position,
+                    progress_callback = partial(
+                        update_progress,
+                        this_task,
+                    ),
+                    semaphore = chunk_slots,
+                    max_workers = CHUNK_CONCURRENCY,
+                    fd = file.fileno(),
+                )
+                result = uploader.upload()
+        flush_progress(this_task)
         tracker.release(position)
         if result is True:
-            asset['source'] = filepath.relative_to(origin_path)
+            asset['source'] = filepath_display
             asset['outcome'] = 'Succeeded'
         else:
             logger.warning(f'{name}: upload did not complete successfully')
@@ -580,37 +743,26 @@ def upload_handler(
         return asset
     
     def process_queued_item(item: QueuedAsset) -> dict:
-        # Check to see if this file now has a remote side parent folder that we can place it in
-        if directories.get(item.filepath.parent):
-            destination_id = directories.get(item.filepath.parent)
-        else:
-            # Initially set the origin path -> ID
-            directories[item.origin_path] = item.destination_id
-            destination_id = item.destination_id
-        if item.filepath.is_file():
-            return upload_file(
-                destination_id,
-                item.filepath,
-                origin_path = item.origin_path,
-            )
-        elif item.filepath.is_dir():
-            # Create the asset folder
-            folder = create_folder(
-                parent_id = destination_id,
-                folder = item.filepath,
-                name = item.filepath.name,
-            )
-            if not folder:
-                logger.error(f'Did not successfully create this folder asset on remote side: {item.filepath}')
-                return
-            # And store a relationship between that new asset ID and the dirpath
-            directories[item] = folder['id']
-            return folder
+        return upload_file(
+            resolve(destination_of(item)),
+            item.filepath,
+            filepath_display = item.display_path,
+            filesize = item.filesize,
+        )
     
-    for result in utils.exec_stream(
-        process_queued_item,
-        queued_items,
-        capacity = capacity,
+    def execute(item: QueuedAsset) -> tuple:
+        return (item, process_queued_item(item))
+
+    with (
+        concurrent.futures.ThreadPoolExecutor(max_workers=capacity) as folder_executor,
+        concurrent.futures.ThreadPoolExecutor(max_workers=capacity) as executor,
     ):
+        created = []
+        futures = [ executor.submit(execute, item) for item in schedule_folders(queued_items, folder_executor, created) ]
+        for future in concurrent.futures.as_completed(futures):
+            yield future.result()
+        # Folders with no files in them are only waited on here, so their errors still surface
+        for future in created:
+            future.result()
+    for result in folders:
         yield result
-
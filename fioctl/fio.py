@@ -2,12 +2,13 @@ import click
 import time
 import sys
 from furl import furl
+from requests.adapters import HTTPAdapter
 from frameioclient import utils as client_utils, FrameioClient
 from .config import config as fioconf
 from .config import nested_get
 
 
-def fio_client(profile=None) -> FrameioClient:
+def fio_client(profile=None, pool_size=None) -> FrameioClient:
     profile = profile or fioconf.fetch("profiles", "default") or "default"
     token = fioconf.fetch(profile, "bearer_token")
     host = fioconf.fetch(profile, "host") or "https://api.frame.io"
@@ -15,7 +16,16 @@ def fio_client(profile=None) -> FrameioClient:
         click.echo("Please specify a host using HTTPS, this will not work with HTTP. Exiting...")
         time.sleep(1)
         sys.exit(1)
-    return FrameioClient(token, host=host)
+    client = FrameioClient(token, host=host)
+    if pool_size:
+        # Keep enough keep-alive connections open for every thread sharing this client,
+        # reusing the retry policy the client already configured
+        retries = client.session.get_adapter(host).max_retries
+        client.session.mount(
+            "https://",
+            HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries),
+        )
+    return client
 
 
 def stream_endpoint(endpoint, page=1, page_size=15, client=None, **_kwargs):
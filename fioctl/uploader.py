@@ -1,22 +1,56 @@
 from pathlib import Path
-from rich.progress import Progress, TaskID
-from typing import List, Callable
+from typing import Callable
 import concurrent.futures
+import contextlib
+import itertools
 import logging
-import math
 import os
+import queue
+import random
 import requests
+import requests.adapters
 import threading
 import time
 
 from . import utils
 
-thread_local = threading.local()
+# Default number of chunks of one file that are uploaded at once
+CHUNK_CONCURRENCY = 16
+# Most chunks uploaded at once across all files, each file still gets up to CHUNK_CONCURRENCY
+UPLOAD_CONCURRENCY = CHUNK_CONCURRENCY * 2
+# Most chunks of one file that are queued up for the workers at any time
+CHUNK_WINDOW = 16
+# Chunk sizes are rounded up to a multiple of this where possible, when alignment is asked for
+CHUNK_ALIGNMENT = 1024 * 1024
+# Attempts at each chunk, and the longest to keep retrying one for
+CHUNK_RETRIES = 6
+CHUNK_RETRY_TIME_SEC = 1920
+
+# One process-wide session, so connections to the upload host are reused across chunks and files
+_SESSION = requests.Session()
+_SESSION.mount(
+    'https://',
+    requests.adapters.HTTPAdapter(
+        pool_connections = UPLOAD_CONCURRENCY,
+        pool_maxsize = UPLOAD_CONCURRENCY,
+        max_retries = 0,
+    ),
+)
 
 logger = logging.getLogger(__name__)
 
 class FrameioUploader(object):
-    def __init__(self, asset: dict, filepath: str | Path, position = None, progress_callback: Callable = None):
+    def __init__(
+        self,
+        asset: dict,
+        filepath: str | Path,
+        position = None,
+        progress_callback: Callable = None,
+        semaphore: threading.Semaphore = None,
+        max_workers: int = CHUNK_CONCURRENCY,
+        fd: int = None,
+        align_chunks: bool = False,
+    ):
         self.asset = asset
         self.chunk_size = None
         self.chunk_urls = asset['upload_urls']
@@ -24,84 +58,122 @@ class FrameioUploader(object):
         self.file = filepath
         self.filename = asset['name']
         self.filesize = asset['filesize']
-        self.futures = []
+        # A descriptor that's passed in stays open, it belongs to the caller
+        self._fd = fd
+        self._owns_fd = fd is None
+        self._real_path = os.path.realpath(filepath) if fd is None else None
+        # Only needed where positional reads aren't available
+        self._read_lock = threading.Lock()
+        self.max_workers = max_workers
+        # Uneven part sizes are not yet verified against the API, the documented even split is the default
+        self.align_chunks = align_chunks
         self.position = position
         self.progress_callback = progress_callback
+        # Optionally shared between uploaders, to bound the number of chunks in flight overall
+        self.semaphore = semaphore or contextlib.nullcontext()
 
 
-    def _calculate_chunks(self) -> List[int]:
-        """
-        Calculate chunk divisions
-
-        :return chunk_offsets: List of chunk offsets
-
-        """
-        self.chunk_size = int(math.ceil(self.filesize / self.chunks_num))
-        chunk_offsets = list()
-        for index in range(self.chunks_num):
-            offset_amount = index * self.chunk_size
-            chunk_offsets.append(offset_amount)
-        return chunk_offsets
+    def _get_session(self):
+        return _SESSION
 
 
-    def _get_session(self):
-        if not hasattr(thread_local, 'session'):
-            thread_local.session = requests.Session()
-        return thread_local.session
+    def _chunk_length(self, chunk_offset: int, is_final_chunk: bool) -> int:
+        if is_final_chunk:
+            # If it's the final chunk, we want to just read until the end of the file
+            return self.filesize - chunk_offset
+        # If it's not the final chunk, we want to ONLY read the specified chunk
+        return self.chunk_size
 
 
-    def _smart_read_chunk(self, chunk_offset: int, is_final_chunk: bool) -> bytes:
-        with open(os.path.realpath(self.file), 'rb') as file:
-            file.seek(chunk_offset, 0)
-            if is_final_chunk:
-                # If it's the final chunk, we want to just read until the end of the file
-                data = file.read()
-            else:
-                # If it's not the final chunk, we want to ONLY read the specified chunk
-                data = file.read(self.chunk_size)
-            return data
+    def _read_chunk(self, chunk_offset: int, length: int) -> bytes:
+        # Read at an offset without moving a shared file position, so workers don't take turns.
+        # A file that shrank since it was scanned just gives a short read
+        if hasattr(os, 'pread'):
+            return os.pread(self._fd, length, chunk_offset)
+        with self._read_lock:
+            os.lseek(self._fd, chunk_offset, os.SEEK_SET)
+            return os.read(self._fd, length)
 
 
     def _upload_chunk(self, task) -> int:
         url, chunk_offset, chunk_id = task
         is_final_chunk = bool( chunk_id + 1 == self.chunks_num )
-        r = None
+        body = self._read_chunk(chunk_offset, self._chunk_length(chunk_offset, is_final_chunk))
         session = self._get_session()
-        chunk_data = self._smart_read_chunk(chunk_offset, is_final_chunk)
-        r = utils.retry(
-            session.put,
-            url,
-            data = chunk_data,
-            headers = {
-                'content-type': self.asset['filetype'],
-                'x-amz-acl': 'private',
-            },
-            max_retry_time_sec = 1920,
-        )
-        try:
-            if r:
-                r.raise_for_status()
-        except requests.HTTPError:
-            # Retry
-            self._upload_chunk(task)
-        return len(chunk_data)
+        deadline = time.monotonic() + CHUNK_RETRY_TIME_SEC
+        for attempt in range(CHUNK_RETRIES):
+            try:
+                with self.semaphore:
+                    r = session.put(
+                        url,
+                        data = body,
+                        headers = {
+                            'content-type': self.asset['filetype'],
+                            'content-length': str(len(body)),
+                            'x-amz-acl': 'private',
+                        },
+                    )
+                # Only throttling and server side errors are worth another try
+                if r.status_code < 500 and r.status_code != 429:
+                    r.raise_for_status()
+                    return len(body)
+                error = requests.HTTPError(f'{r.status_code} {r.reason} for url: {url}', response = r)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            sleep_sec = min(30, 2 ** attempt) + random.random()
+            if attempt + 1 == CHUNK_RETRIES or time.monotonic() + sleep_sec > deadline:
+                break
+            logger.warning(f'{self.filename}: chunk {chunk_id}: {error} - Retrying after {sleep_sec:.1f} sec')
+            time.sleep(sleep_sec)
+        raise error
     
 
-    def upload(self) -> bool:
-        logger.debug(f'Start upload: {self.filename} ({self.asset['id']})')
-        start = time.time()
-        chunk_offsets = self._calculate_chunks()
+    def close(self):
+        if self._fd is not None and self._owns_fd:
+            os.close(self._fd)
+            self._fd = None
+
+
+    def _open_file(self):
+        if self._fd is None:
+            self._fd = os.open(self._real_path, os.O_RDONLY)
+        if hasattr(os, 'posix_fadvise'):
+            # Chunks are read front to back, let the kernel read ahead
+            os.posix_fadvise(self._fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+
+    def _upload_single_chunk(self) -> bool:
+        # Nothing to run alongside it, so it's sent from this thread without a pool
+        self.progress_callback(start=True)
+        try:
+            chunk_size = self._upload_chunk((self.chunk_urls[0], 0, 0))
+        except Exception as e:
+            logger.error(e)
+            logger.debug(e, exc_info=1)
+            return False
+        self.progress_callback(chunk_size)
+        return True
+
+
+    def _upload_chunks(self) -> bool:
         first_chunk_completed = False
-        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-            # Create a task for each chunk
-            for chunk_id in range(self.chunks_num):
-                url = self.chunk_urls[chunk_id]
-                chunk_offset = chunk_offsets[chunk_id]
-                task = (url, chunk_offset, chunk_id)
-                future = executor.submit(self._upload_chunk, task)
-                self.futures.append(future)
-            # Wait on threads to finish
-            for future in concurrent.futures.as_completed(self.futures):
+        # Chunks submitted ahead of completions, so pending work stays bounded however many chunks there are
+        window = max(1, min(self.chunks_num, max(self.max_workers, CHUNK_WINDOW)))
+        completed = queue.SimpleQueue()
+        in_flight = 0
+        chunk_ids = iter(range(self.chunks_num))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, self.chunks_num))) as executor:
+            while True:
+                # Top the window back up with a task for each next chunk
+                for chunk_id in itertools.islice(chunk_ids, window - in_flight):
+                    task = (self.chunk_urls[chunk_id], chunk_id * self.chunk_size, chunk_id)
+                    executor.submit(self._upload_chunk, task).add_done_callback(completed.put)
+                    in_flight += 1
+                if in_flight == 0:
+                    return True
+                # Wait on the next chunk to finish
+                future = completed.get()
+                in_flight -= 1
                 try:
                     if first_chunk_completed is False:
                         self.progress_callback(start=True)
@@ -112,8 +184,35 @@ class FrameioUploader(object):
                     logger.error(e)
                     logger.debug(e, exc_info=1)
                     return False
+
+
+    def upload(self) -> bool:
+        logger.debug('Start upload: %s (%s)', self.filename, self.asset['id'])
+        start = time.time()
+        # Ceiling division, the final chunk is the short one
+        self.chunk_size = -(-self.filesize // self.chunks_num)
+        if self.align_chunks:
+            # Round up to a whole MiB when the final chunk still gets some of the file, so every other
+            # chunk is sent in full-sized TLS records
+            aligned_chunk_size = -(-self.chunk_size // CHUNK_ALIGNMENT) * CHUNK_ALIGNMENT
+            if ( self.chunks_num - 1 ) * aligned_chunk_size < self.filesize:
+                self.chunk_size = aligned_chunk_size
+        with contextlib.closing(self):
+            try:
+                self._open_file()
+            except OSError as e:
+                # Gone or unreadable since it was scanned, only this file fails
+                logger.error(f'{self.filename}: {e}')
+                return False
+            if self.chunks_num == 1:
+                completed = self._upload_single_chunk()
+            else:
+                completed = self._upload_chunks()
+        if not completed:
+            return False
         end = time.time()
-        speed_byte_s = utils.format_data_speed_bytes_sec( self.filesize / ( end - start ) )
-        speed_bit_s = utils.format_data_speed_mbits_sec( self.filesize / ( end - start ) )
-        logger.info(f'{self.filename}: Upload completed - Elapsed: - Speed: {speed_byte_s} ({speed_bit_s})')
-        return True
\ No newline at end of file
+        if logger.isEnabledFor(logging.INFO):
+            speed_byte_s = utils.format_data_speed_bytes_sec( self.filesize / ( end - start ) )
+            speed_bit_s = utils.format_data_speed_mbits_sec( self.filesize / ( end - start ) )
+            logger.info(f'{self.filename}: Upload completed - Elapsed: - Speed: {speed_byte_s} ({speed_bit_s})')
+        return True
@@ -1,5 +1,5 @@
 from datetime import datetime
-from functools import partialmethod
+from functools import lru_cache, partial, partialmethod
 from pathlib import Path
 from rich.console import Group
 from rich.panel import Panel
@@ -19,30 +19,29 @@ from rich.progress import (
 from rich.table import Column, Table
 from rich.text import Text
 from tabulate import tabulate
-from token_bucket import Limiter
-from token_bucket import MemoryStorage
 from tqdm import tqdm
 from treelib import Node, Tree
-from typing import Callable
-import bitmath
+from typing import Callable, Iterable
 import click
 import concurrent.futures
 import heapq
 import itertools
 import json
 import logging
-import math
 import os
+import queue
 import re
 import sys
 import threading
 import time
-import urllib
+import urllib.request
 
-from .config import nested_get, nested_set
+from .config import nested_get
 from .config import config as fio_config
 
 TRUNCATION_CUTOFF = 100
+# Transfers advance far more often than this, the display only needs to catch up now and then
+PROGRESS_REFRESH_PER_SECOND = 2
 
 logger = logging.getLogger(__name__)
 
@@ -70,12 +69,15 @@ class UpdateType(click.ParamType):
     name = "update"
 
     def convert(self, value, _param, _ctx):
-        update = [tuple(val.strip().split("=")) for val in value.split(",")]
-        nested_update = [(column.split("."), update) for (column, update) in update]
-
         update = {}
-        for (nested_key, val) in nested_update:
-            nested_set(update, nested_key, val)
+        for pair in value.split(","):
+            # Only the first '=' separates the column, values may contain their own
+            column, val = pair.strip().split("=", 1)
+            *parents, key = column.split(".")
+            target = update
+            for parent in parents:
+                target = target.setdefault(parent, {})
+            target[key] = val
 
         return update
 
@@ -83,10 +85,6 @@ class UpdateType(click.ParamType):
 class FormatType(click.ParamType):
     name = "format"
 
-    def __init__(self):
-        self.fetch_map = {}
-        super(FormatType, self).__init__()
-
     def convert(self, value, _param, _ctx):
         return self.formatters()[value]
 
@@ -109,7 +107,7 @@ class FormatType(click.ParamType):
             return
 
         for val in value:
-            click.echo(self._format_json(value, **kwargs))
+            click.echo(self._format_json(val, **kwargs))
 
     def _format_json(self, value, **kwargs):
         return json.dumps(value, indent=2, sort_keys=True)
@@ -121,14 +119,14 @@ class FormatType(click.ParamType):
         tree = Tree()
         root_name, root = root
         tree.create_node(root_name, root)
-        self._build_fetch_map(cols)
+        paths = self._prepare(cols)
 
-        def format_node(value, cols):
-            return line_fmt((col, self._get_column(value, col)) for col in cols)
+        def format_node(value):
+            return line_fmt((col, self._get_path(value, path)) for col, path in paths)
 
         for value in values:
             tree.create_node(
-                format_node(value, cols),
+                format_node(value),
                 value["id"],
                 parent=(value.get("parent_id") or root),
             )
@@ -141,24 +139,23 @@ class FormatType(click.ParamType):
         if isinstance(value, dict):
             value = [value]
 
-        self._build_fetch_map(cols)
+        paths = self._prepare(cols)
         click.echo(",".join(cols))
         for val in value:
-            click.echo(self._csv_line(val, cols))
+            click.echo(self._csv_line(val, paths))
 
-    def _csv_line(self, value, cols):
-        return ",".join(str(self._get_column(value, col)) for col in cols)
+    def _csv_line(self, value, paths):
+        return ",".join(str(self._get_path(value, path)) for _, path in paths)
 
     def format_table(self, value, cols=None, **kwargs):
         tablefmt = fio_config.fetch("table", "fmt") or "psql"
         if isinstance(value, dict):
             cols = cols or value.keys()
-            self._build_fetch_map(cols)
             click.echo(
                 tabulate(
                     [
-                        (col, self._convert(self._get_column(value, col)))
-                        for col in cols
+                        (col, self._convert(self._get_path(value, path)))
+                        for col, path in self._prepare(cols)
                     ],
                     headers=["attribute", "value"],
                     tablefmt=tablefmt,
@@ -166,75 +163,96 @@ class FormatType(click.ParamType):
             )
             return
 
-        value = list(value)
-        cols = cols or list(value[0].keys())
-        self._build_fetch_map(cols)
+        if not cols:
+            # Columns come from the first row, only that one needs to be looked at up front
+            value = iter(value)
+            first = next(value, None)
+            if first is None:
+                return
+            cols = list(first.keys())
+            value = itertools.chain([first], value)
         click.echo(
             tabulate(
-                self._list_table_format(value, cols), headers=cols, tablefmt=tablefmt
+                self._list_table_format(value, self._prepare(cols)), headers=cols, tablefmt=tablefmt
             )
         )
 
-    def _get_column(self, value, column):
-        column = self.fetch_map.get(column, [column])
-        return truncate_string(nested_get(value, column))
+    def _get_path(self, value, path):
+        return truncate_string(nested_get(value, path))
 
-    def _build_fetch_map(self, columns):
-        self.fetch_map = {col: col.split(".") for col in columns}
+    def _prepare(self, columns):
+        """Splits each column into its key path once, rather than looking it up per row"""
+        return [(col, tuple(col.split("."))) for col in columns]
 
     def _convert(self, value):
         if isinstance(value, dict):
             return self._format_json(value)
         return value
 
-    def _list_table_format(self, l, cols):
-        def tableize_row(row):
-            return [self._convert(self._get_column(row, col)) for col in cols]
+    def _list_table_format(self, l, paths):
+        get_path = self._get_path
+        convert = self._convert
+        return ([convert(get_path(row, path)) for _, path in paths] for row in l)
+
 
-        return [tableize_row(row) for row in l]
+@lru_cache(maxsize=64)
+def compile_regex(pattern: str) -> re.Pattern:
+    """Compiled patterns are shared for the life of the process"""
+    return re.compile(pattern)
 
 
 class RegexType(click.ParamType):
     name = "regex"
 
     def convert(self, pattern, _param, _ctx):
+        if isinstance(pattern, re.Pattern):
+            return pattern
         try:
-            r = re.compile(pattern)
-            search = partial(
-                re.search,
-                pattern
-            )
-            return search
+            return compile_regex(pattern)
         except re.error as e:
-            click.ParamType.fail(f'Not a valid regex, check the string: {pattern}')
+            self.fail(f'Not a valid regex, check the string: {pattern}')
 
 
 class TransferSpeedColumn(ProgressColumn):
     """Renders human readable transfer speed."""
 
+    def __init__(self, **kwargs):
+        super(TransferSpeedColumn, self).__init__(**kwargs)
+        # Last speed rendered and its text, reused while the speed holds steady
+        self.last_render = (None, None)
+
     def render(self, task) -> Text:
         """Show data transfer speed."""
         speed = task.finished_speed or task.speed
         if speed is None:
             return Text('', style="progress.data.speed")
-        data_speed_bytes = format_data_speed_bytes_sec(int(speed))
-        data_speed_bits =format_data_speed_mbits_sec(int(speed))
-        return Text(f"{data_speed_bytes} ({data_speed_bits})", style="progress.data.speed")
+        speed = int(speed)
+        last_speed, text = self.last_render
+        if speed == last_speed:
+            return text
+        data_speed_bytes = format_data_speed_bytes_sec(speed)
+        data_speed_bits =format_data_speed_mbits_sec(speed)
+        text = Text(f"{data_speed_bytes} ({data_speed_bits})", style="progress.data.speed")
+        self.last_render = (speed, text)
+        return text
 
 
 class TransferProgressItems(Progress):
-    columns = Progress(
-        SpinnerColumn(finished_text="✅"),
-        TextColumn('[progress.description]{task.description}'),
-        TextColumn('|'),
-        TotalFileSizeColumn(),
-        TextColumn('|'),
-        BarColumn(bar_width=None),
-        TextColumn('|'),
-        TaskProgressColumn(),
-        TextColumn('|'),
-        transient = True,
-    )
+    def __init__(self, refresh_per_second: float = PROGRESS_REFRESH_PER_SECOND, **kwargs):
+        kwargs.setdefault('transient', True)
+        super(TransferProgressItems, self).__init__(
+            SpinnerColumn(finished_text="✅"),
+            TextColumn('[progress.description]{task.description}'),
+            TextColumn('|'),
+            TotalFileSizeColumn(),
+            TextColumn('|'),
+            BarColumn(bar_width=None),
+            TextColumn('|'),
+            TaskProgressColumn(),
+            TextColumn('|'),
+            refresh_per_second = refresh_per_second,
+            **kwargs,
+        )
 
     def get_renderables(self):
         """Wrap it in a panel"""
@@ -247,8 +265,8 @@ class TransferProgressItems(Progress):
 
 
 class TransferProgressTotal(Progress):
-    def __init__(self, transfer_type: str, **kwargs):
-        super(TransferProgressTotal, self).__init__(**kwargs)
+    def __init__(self, transfer_type: str, refresh_per_second: float = PROGRESS_REFRESH_PER_SECOND, **kwargs):
+        super(TransferProgressTotal, self).__init__(refresh_per_second=refresh_per_second, **kwargs)
         # Totals
         self.files_count_id = self.add_task('total_files_num', total=0, start=False)
         self.filesize_id = self.add_task('total_filesize', total=0)
@@ -259,6 +277,10 @@ class TransferProgressTotal(Progress):
             self.transfer_type_display = '⬆  Uploading'
         elif self.transfer_type == 'download':
             self.transfer_type_display = '⬇  Downloading'
+        # Renderers for the totals, made once rather than on every refresh
+        self.speed_column = TransferSpeedColumn()
+        self.elapsed_column = TimeElapsedColumn()
+        self.remaining_column = TimeRemainingColumn()
 
     
     def files_update(self, **kwargs):
@@ -282,21 +304,17 @@ class TransferProgressTotal(Progress):
         table_topline = Table.grid(padding=(0, 1), expand=False)
         table_topline.add_row(
             Text(f'{self.transfer_type_display}'),
-            TransferSpeedColumn().render(task=self.filesize),
+            self.speed_column.render(task=self.filesize),
         )
         table_topline.row_styles = 'bold'
-        table_bar = Table.grid(padding=(0, 1), expand=True)
-        table_bar.add_row(
-            BarColumn(bar_width=None).render(task=self.filesize),
-        )
         table_detailed = Table.grid(padding=(0, 1), expand=False)
         table_detailed.add_row(
             f'{self.files.completed} of {self.files.total} file(s) -',
             f'{format_data_bytes(self.filesize.completed)} of {format_data_bytes(self.filesize.total)} -',
             'Elapsed:',
-            TimeElapsedColumn().render(task=self.filesize),
+            self.elapsed_column.render(task=self.filesize),
             ' - Remaining:',
-            TimeRemainingColumn().render(task=self.filesize),
+            self.remaining_column.render(task=self.filesize),
         )
         progress_panel = Panel(
             Group(
@@ -307,39 +325,71 @@ class TransferProgressTotal(Progress):
         yield progress_panel
 
 
+class Lazy(object):
+    """
+    Defers a call until its result is first asked for, then hands that same
+    result (or exception) to every caller. Safe to share between threads.
+    """
+    def __init__(self, callable, *args, **kwargs):
+        self.call = partial(callable, *args, **kwargs)
+        self.lock = threading.Lock()
+        self.future = None
+
+    def result(self):
+        with self.lock:
+            if self.future is None:
+                self.future = concurrent.futures.Future()
+                try:
+                    self.future.set_result(self.call())
+                except Exception as e:
+                    self.future.set_exception(e)
+        return self.future.result()
+
+
 def increment_task_total(progress: Progress, task_id: int, advance: int=0):
     task = progress._tasks[task_id]
     task.total += advance
     return task.total
 
 
-def create_include_exclude_filter(user_re_include, user_re_exclude):
-    re_include = user_re_include if user_re_include else lambda value: True
-    re_exclude = user_re_exclude if user_re_exclude else lambda value: True
-    def _callable(value):
-        if re_include(value) and not re_exclude(value):
-            return True
-        return False
-    return _callable
-
+def combine_patterns(patterns: Iterable[re.Pattern]) -> Callable[[str], object] | None:
+    """
+    Returns a single search function over several compiled patterns. Where possible they are
+    joined into one alternation, so a value is matched against all of them in one `search` call.
+    Patterns with groups (whose backreferences would be renumbered), with flags, or that
+    otherwise don't combine cleanly are searched one after another instead
+    """
+    patterns = list(patterns or ())
+    if not patterns:
+        return None
+    if len(patterns) == 1:
+        return patterns[0].search
+    if not any(p.groups or p.flags != re.UNICODE for p in patterns):
+        try:
+            return compile_regex("|".join(f"(?:{p.pattern})" for p in patterns)).search
+        except re.error:
+            pass
+    return lambda value: any(p.search(value) for p in patterns)
 
-def merge_streams(*streams, key=lambda x: x["id"]):
-    heap = []
-    fetch = lambda stream: next(stream, None)
 
-    def enqueue(stream, idx):
-        head = fetch(stream)
-        if not head:
-            return
-        heapq.heappush(heap, (key(head), idx, stream, head))
+def create_include_exclude_filter(user_re_include, user_re_exclude):
+    include_search = combine_patterns(user_re_include)
+    exclude_search = combine_patterns(user_re_exclude)
+    if not include_search and not exclude_search:
+        # Nothing to filter on, let everything through
+        return lambda value: True
+    # Each check is then a direct call into the compiled pattern(s).
+    # Only the checks that were asked for end up in the filter
+    if not exclude_search:
+        return lambda value: bool(include_search(value))
+    if not include_search:
+        return lambda value: not exclude_search(value)
+    return lambda value: bool(include_search(value)) and not exclude_search(value)
 
-    for idx, stream in enumerate(streams):
-        enqueue(stream, idx)
 
-    while heap:
-        _, idx, stream, result = heapq.heappop(heap)
-        yield result
-        enqueue(stream, idx)
+def merge_streams(*streams, key=lambda x: x["id"]):
+    """Lazily merges streams that are each already sorted by `key`, earlier streams first on ties"""
+    return heapq.merge(*streams, key=key)
 
 
 def datetime_compare(first, second):
@@ -347,70 +397,68 @@ def datetime_compare(first, second):
 
 
 def from_iso(date_string):
-    return datetime.strptime(date_string, "%Y-%m-%dT%H:%M:%S.%fZ")
+    # Same naive datetime as strptime("%Y-%m-%dT%H:%M:%S.%fZ"), without the generic format parser
+    return datetime.fromisoformat(date_string.removesuffix("Z"))
 
 
-def exec_stream(callable, iterable, sync=lambda _: False, capacity=10, rate=10):
+def parallelize(callable, iterable, capacity=10, ordered=False):
     """
-    Executes a stream according to a defined rate limit.
+    Runs `callable` over `iterable` on `capacity` threads, yielding results as they complete,
+    or in input order with `ordered`. Items are only taken from `iterable` as results
+    come back, up to `capacity * 4` ahead.
     """
-    limiter = Limiter(capacity, rate, MemoryStorage())
-    futures = set()
-
-    def execute(operation):
-        return (operation, callable(operation))
-
-    with concurrent.futures.ThreadPoolExecutor(max_workers=capacity) as executor:
-        while True:
-            if not limiter.consume("stream", 1):
-                start = int(time.time())
-                done, pending = concurrent.futures.wait(
-                    futures, return_when=concurrent.futures.FIRST_COMPLETED
-                )
-                for future in done:
-                    yield future.result()
-
-                futures = pending
-                if (int(time.time()) - start) < 1:
-                    time.sleep(
-                        1.0 / rate
-                    )  # guarantee there's capacity in the rate limit at end of the loop
-
-            operation = next(iterable, None)
-
-            if not operation:
-                done, _ = concurrent.futures.wait(futures)
-                for future in done:
-                    yield future.result()
-                break
-
-            if sync(operation):
-                yield execute(operation)
-                continue
-
-            futures.add(executor.submit(execute, operation))
-
+    # A pool per call, so a task can parallelize in turn without waiting on its own workers.
+    # Work that hasn't started is cancelled if the caller stops early
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=capacity)
+    try:
+        if ordered:
+            for result in executor.map(callable, iterable):
+                yield result
+            return
 
-def parallelize(callable, iterable, capacity=10):
-    with concurrent.futures.ThreadPoolExecutor(max_workers=capacity) as executor:
-        for result in executor.map(callable, iterable):
-            yield result
+        completed = queue.SimpleQueue()
+        in_flight = 0
+        for item in iterable:
+            if in_flight >= capacity * 4:
+                yield completed.get().result()
+                in_flight -= 1
+            executor.submit(callable, item).add_done_callback(completed.put)
+            in_flight += 1
+        for _ in range(in_flight):
+            yield completed.get().result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
 
 
 class Updater(object):
-    def __init__(self, pbar):
+    """
+    Report hook for `urlretrieve`, which calls it for every block read. The bar is only
+    advanced once at least `min_bytes` have come in or `min_interval` seconds have passed
+    """
+    def __init__(self, pbar, min_bytes: int = 1 << 20, min_interval: float = 0.25):
         super(Updater, self).__init__()
         self.pbar = pbar
+        self.min_bytes = min_bytes
+        self.min_interval = min_interval
+        self.n = 0
+        self.last_update = time.monotonic()
 
     def update_to(self, b=1, bsize=1, tsize=None):
         if tsize is not None:
             self.pbar.total = tsize
-        self.pbar.update(b * bsize - self.pbar.n)  # will also set self.n = b * bsize
+        self.n = b * bsize
+        now = time.monotonic()
+        if self.n - self.pbar.n >= self.min_bytes or now - self.last_update >= self.min_interval:
+            self.last_update = now
+            self.flush()
+
+    def flush(self):
+        self.pbar.update(self.n - self.pbar.n)  # will also set self.pbar.n = self.n
 
 
 def download(url, name, desc=None, position=None):
     tdm_args = dict(
-        unit="B", unit_scale=True, miniters=1, desc=(desc or name), leave=False
+        unit="B", unit_scale=True, miniters=1, mininterval=0.25, desc=(desc or name), leave=False
     )
     if position:
         tdm_args["position"] = position
@@ -420,59 +468,73 @@ def download(url, name, desc=None, position=None):
         urllib.request.urlretrieve(
             url, filename=name, reporthook=updater.update_to, data=None
         )
+        updater.flush()
 
 
-def chunker(iterable, n):
-    it = iter(iterable)
-    while True:
-        chunk = tuple(itertools.islice(it, n))
-        if not chunk:
-            return
-        yield chunk
-
-
-def stream_fs(root, filter_d, filter_f):
-    for directory, subdirs, files in os.walk(root):
-        for d in subdirs:
-            if filter_d(d):
-                logger.debug(f'Filter - OK: {d}')
-                yield ("d", os.path.join(directory, d))
-            else:
-                logger.debug(f'Filter - Skipped: {d}')
-        for f in files:
-            if filter_f(f):
-                logger.debug(f'Filter - OK: {f}')
-                yield ("f", os.path.join(directory, f))
-            else:
-                logger.debug(f'Filter - Skipped: {f}')
-
-def stream_fs_pathlib(root: Path, filter_d, filter_f):
-    for directory, dirs, files in root.walk():
-        for d in dirs:
-            if filter_d(d):
-                logger.debug(f'Filter - OK: {d}')
-                yield ( 'd', directory.joinpath(d) )
-            else:
-                logger.debug(f'Filter - Skipped: {d}')
-        for f in files:
-            if filter_f(f):
-                logger.debug(f'Filter - OK: {f}')
-                yield ( 'f', directory.joinpath(f) )
-            else:
-                logger.debug(f'Filter - Skipped: {f}')
-
-
-def retry(callable, *args, max_retry_time_sec: int = 4, **kwargs):
-    retry_time_sleep = max_retry_time_sec
-    attempt = kwargs.pop("attempt", 0)
+try:
+    # Same tuples of up to `n` items, done in C
+    from itertools import batched as chunker
+except ImportError:
+    def chunker(iterable, n):
+        it = iter(iterable)
+        while True:
+            chunk = tuple(itertools.islice(it, n))
+            if not chunk:
+                return
+            yield chunk
+
+
+def stream_fs_pathlib(root: Path, filter_d, filter_f, capacity: int = 8):
+    """
+    Walks `root` with `os.scandir`, yielding `(type, path, stat)` for each folder ('d')
+    and file ('f') that passes its filter. Entry types come from the directory listing
+    itself, so only files are stat'ed (folders yield `None`). Skipped folders are not descended into.
+    Up to `capacity` folders are listed at once, so a folder comes before its contents but
+    the order is otherwise not stable.
+    """
+    debug = logger.isEnabledFor(logging.DEBUG)
+
+    def scan(directory) -> list:
+        found = []
+        try:
+            entries = os.scandir(directory)
+        except OSError as e:
+            # Unreadable folders (.Trashes etc) are skipped, as os.walk would
+            logger.warning('Could not read folder, skipping: %s (%s)', directory, e)
+            return found
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if filter_d(entry.name):
+                        if debug:
+                            logger.debug('Filter - OK: %s', entry.name)
+                        found.append(( 'd', Path(entry.path), None ))
+                    elif debug:
+                        logger.debug('Filter - Skipped: %s', entry.name)
+                elif entry.is_file():
+                    if filter_f(entry.name):
+                        if debug:
+                            logger.debug('Filter - OK: %s', entry.name)
+                        found.append(( 'f', Path(entry.path), entry.stat() ))
+                    elif debug:
+                        logger.debug('Filter - Skipped: %s', entry.name)
+        return found
+
+    # Finished listings are pushed here as they complete, so waiting on them never scans the ones still running
+    completed = queue.SimpleQueue()
+    executor = concurrent.futures.ThreadPoolExecutor(capacity)
     try:
-        callable(*args, **kwargs)
-    except Exception as e:
-        sleep_sec = min(0.5 * math.pow(2, attempt), retry_time_sleep)
-        logger.warning(f"{e} - Retrying after {sleep_sec/60} min")
-        time.sleep(sleep_sec)
-        kwargs["attempt"] = attempt + 1
-        retry(callable, *args, **kwargs)
+        executor.submit(scan, root).add_done_callback(completed.put)
+        in_flight = 1
+        while in_flight:
+            in_flight -= 1
+            for item in completed.get().result():
+                if item[0] == 'd':
+                    executor.submit(scan, item[1]).add_done_callback(completed.put)
+                    in_flight += 1
+                yield item
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
 
 
 def initialize_tqdm():
@@ -481,33 +543,46 @@ def initialize_tqdm():
 
 class PositionTracker(object):
     def __init__(self, size):
-        self.positions = range(size)
-        self.used = set()
+        # Free positions as a heap, so the lowest one is always handed out first
+        self.free = list(range(size))
+        heapq.heapify(self.free)
         self.lock = threading.RLock()
 
     def acquire(self):
         with self.lock:
-            position = min(list(pos for pos in self.positions if pos not in self.used))
-            self.used.add(position)
-            return position
+            return heapq.heappop(self.free)
 
     def release(self, position):
         with self.lock:
-            self.used.remove(position)
+            heapq.heappush(self.free, position)
+
+
+# SI byte units, largest first
+SI_BYTE_UNITS = (
+    (10 ** 24, 'YB'),
+    (10 ** 21, 'ZB'),
+    (10 ** 18, 'EB'),
+    (10 ** 15, 'PB'),
+    (10 ** 12, 'TB'),
+    (10 ** 9, 'GB'),
+    (10 ** 6, 'MB'),
+    (10 ** 3, 'kB'),
+)
 
 
 def format_data_bytes(
     bytes: int,
     pl: int = 2
-) -> bitmath.Byte:
+) -> str:
     """
     Given bytes, returns a formatted size with best units in 2 decimal places
 
     :param pl: decimal places to format to
     """
-    return bitmath.Byte(bytes).best_prefix(system=bitmath.SI).format(
-        '{value:.' + str(pl) + 'f} {unit}',
-    )
+    for scale, unit in SI_BYTE_UNITS:
+        if bytes >= scale:
+            return f'{bytes / scale:.{pl}f} {unit}'
+    return f'{bytes:.{pl}f} B'
 
 
 def format_data_speed_bytes_sec(
@@ -522,6 +597,4 @@ def format_data_speed_mbits_sec(
     pl: int = 2,
 ):
     """Always Megabits (and as 'Mbps') to indicate it is an Internet-related measurement"""
-    return bitmath.Byte(bytes).to_Mb().format(
-        '{value:.' + str(pl) + 'f} {unit}ps',
-    )
\ No newline at end of file
+    return f'{bytes * 8 / 10 ** 6:.{pl}f} Mbps'